@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+RTK数据解析热路径加速模块
+提供NMEA异或校验、RTCM CRC24Q校验和DDMM.MMMM坐标解析的编译内核。
+安装numba时使用JIT编译版本，否则回退到纯Python实现。
+CRC24Q在安装crcmod (含C扩展) 时优先使用其编译的查表实现。
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+try:
+    import crcmod
+    from crcmod import _crcfunext  # noqa: F401 仅在C扩展可用时启用
+except ImportError:
+    crcmod = None
+
+HAS_NUMBA = njit is not None
+HAS_C_CRC = crcmod is not None
+
+# CRC24Q多项式 (RTCM 3.x)
+CRC24Q_POLY = 0x1864CFB
+
+
+def _build_crc24q_table() -> np.ndarray:
+    """生成slice-by-8查找表, table[k][b]为字节b后接k个零字节的CRC"""
+    table = np.zeros((8, 256), dtype=np.uint32)
+    for i in range(256):
+        crc = i << 16
+        for _ in range(8):
+            crc <<= 1
+            if crc & 0x1000000:
+                crc ^= CRC24Q_POLY
+        table[0, i] = crc & 0xFFFFFF
+    for k in range(1, 8):
+        for i in range(256):
+            prev = int(table[k - 1, i])
+            table[k, i] = ((prev << 8) & 0xFFFFFF) ^ int(table[0, prev >> 16])
+    return table
+
+
+_CRC24Q_TABLE = _build_crc24q_table()
+# 纯Python回退路径使用的单字节查找表
+_CRC24Q_TABLE0 = tuple(int(v) for v in _CRC24Q_TABLE[0])
+
+
+def _nmea_xor_kernel(buf):
+    """对uint8数组逐字节异或"""
+    x = 0
+    for i in range(buf.shape[0]):
+        x ^= buf[i]
+    return x
+
+
+def _crc24q_kernel(buf):
+    """slice-by-8方式计算CRC24Q"""
+    table = _CRC24Q_TABLE
+    crc = 0
+    n = buf.shape[0]
+    i = 0
+    while i + 8 <= n:
+        x0 = (buf[i] ^ (crc >> 16)) & 0xFF
+        x1 = (buf[i + 1] ^ (crc >> 8)) & 0xFF
+        x2 = (buf[i + 2] ^ crc) & 0xFF
+        crc = (table[7, x0] ^ table[6, x1] ^ table[5, x2] ^
+               table[4, buf[i + 3]] ^ table[3, buf[i + 4]] ^
+               table[2, buf[i + 5]] ^ table[1, buf[i + 6]] ^
+               table[0, buf[i + 7]])
+        i += 8
+    while i < n:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[0, ((crc >> 16) ^ buf[i]) & 0xFF]
+        i += 1
+    return crc
+
+
+def _parse_coord_kernel(buf, neg):
+    """
+    逐位累加解析DDMM.MMMM格式坐标
+
+    Returns:
+        十进制度数，格式非法时返回NaN
+    """
+    int_part = 0
+    frac_part = 0
+    frac_scale = 1
+    seen_dot = False
+    n_digits = 0
+    for i in range(buf.shape[0]):
+        c = int(buf[i])
+        if c == 46:  # '.'
+            if seen_dot:
+                return np.nan
+            seen_dot = True
+        elif 48 <= c <= 57:
+            n_digits += 1
+            if seen_dot:
+                frac_part = frac_part * 10 + (c - 48)
+                frac_scale *= 10
+            else:
+                int_part = int_part * 10 + (c - 48)
+        else:
+            return np.nan
+    if n_digits == 0:
+        return np.nan
+
+    degrees = int_part // 100
+    minutes = (int_part % 100) + frac_part / frac_scale
+    value = degrees + minutes / 60.0
+    return -value if neg else value
+
+
+if HAS_C_CRC:
+    _crc24q_c = crcmod.mkCrcFun(CRC24Q_POLY, initCrc=0, rev=False, xorOut=0)
+
+if HAS_NUMBA:
+    _nmea_xor_jit = njit(cache=True, boundscheck=False)(_nmea_xor_kernel)
+    _crc24q_jit = njit(cache=True, boundscheck=False)(_crc24q_kernel)
+    _parse_coord_jit = njit(cache=True, boundscheck=False)(_parse_coord_kernel)
+
+
+def nmea_xor(data) -> int:
+    """计算NMEA校验和 (不含'$'和'*'的语句体逐字节异或)"""
+    if HAS_NUMBA:
+        return int(_nmea_xor_jit(np.frombuffer(data, np.uint8)))
+    x = 0
+    for b in data:
+        x ^= b
+    return x
+
+
+def crc24q(data) -> int:
+    """计算RTCM CRC24Q校验"""
+    if HAS_C_CRC:
+        return _crc24q_c(data)
+    if HAS_NUMBA:
+        return int(_crc24q_jit(np.frombuffer(data, np.uint8)))
+    table = _CRC24Q_TABLE0
+    crc = 0
+    for byte in data:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[((crc >> 16) ^ byte) & 0xFF]
+    return crc
+
+
+# 坐标字段允许的字符，其余字符 (空白、'_'、正负号、指数等float()会接受的字符) 均为非法
+_COORD_CHARS = '0123456789.'
+
+
+if HAS_NUMBA:
+    def parse_coord(data, neg: bool) -> float:
+        """
+        解析DDMM.MMMM格式坐标为十进制度数，坐标可以是str或bytes
+
+        Raises:
+            ValueError: 坐标格式非法
+        """
+        if isinstance(data, str):
+            data = data.encode('ascii')
+        value = float(_parse_coord_jit(np.frombuffer(data, np.uint8), neg))
+        if value != value:
+            raise ValueError(f"无效坐标: {bytes(data)!r}")
+        return value
+else:
+    def parse_coord(data, neg: bool) -> float:
+        """
+        解析DDMM.MMMM格式坐标为十进制度数，坐标可以是str或bytes
+
+        Raises:
+            ValueError: 坐标格式非法
+        """
+        # NMEA字段本身即为str，直接处理省去编码
+        if data.__class__ is not str:
+            data = str(data, 'ascii')
+        # 与编译内核接受的输入一致: 只含数字和'.'，多个'.'或没有数字由float()拒绝
+        if data.strip(_COORD_CHARS):
+            raise ValueError(f"无效坐标: {data!r}")
+        # CPython下一次float()比按度/分拆分后多次int()更快
+        coord = float(data)
+        degrees = int(coord / 100)
+        value = degrees + (coord - degrees * 100) / 60.0
+        return -value if neg else value
+
+
+_warmed_up = False
+
+
+def warmup():
+    """使用示例输入触发JIT编译，避免首条消息承担编译延迟"""
+    global _warmed_up
+    if _warmed_up:
+        return
+    _warmed_up = True
+    if HAS_NUMBA:
+        nmea_xor(b'GPGGA,')
+        crc24q(b'\xd3\x00\x04\xaa\xbb\xcc\xdd\x00')
+        parse_coord(b'4807.038', False)
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+配置文件加载
+安装orjson时使用其更快的JSON解析，否则回退到标准库json。
+"""
+
+import copy
+import functools
+import json
+import os
+from pathlib import Path
+
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+
+@functools.lru_cache(maxsize=4)
+def _cached_load(path: str) -> dict:
+    """读取并解析配置文件，按绝对路径缓存"""
+    # 直接解析原始字节，省去文本解码
+    return _json_loads(Path(path).read_bytes())
+
+
+def load_config_cached(path: str) -> dict:
+    """
+    加载配置文件，同一文件只读取和解析一次
+
+    Returns:
+        配置的副本，调用方可以随意修改而不影响缓存
+
+    Raises:
+        FileNotFoundError: 配置文件不存在
+        ValueError: JSON格式错误 (json/orjson的解析异常均为其子类)
+    """
+    return copy.deepcopy(_cached_load(os.path.abspath(path)))
@@ -5,6 +5,7 @@ RTK定位系统
 支持NMEA、RTCM协议解析，串口通信和NTRIP客户端功能
 """
 
+import sys
 import serial
 import socket
 import threading
@@ -13,8 +14,9 @@ import struct
 import math
 import base64
 import logging
+import queue
 from datetime import datetime
-from typing import Dict, List, Tuple, Optional, Callable
+from typing import Dict, List, Tuple, Optional, Callable, Union, Iterator
 from dataclasses import dataclass
 from enum import Enum
 
@@ -28,10 +30,65 @@ except ImportError:
     except ImportError:
         PositionHandler = None
 
+try:
+    from . import _rtk_fastpath as fastpath
+except ImportError:
+    import _rtk_fastpath as fastpath
+
 # 配置日志
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 支持的NMEA消息类型 (所有解析器共享)
+_GGA = sys.intern('GGA')
+_RMC = sys.intern('RMC')
+_GLL = sys.intern('GLL')
+_SUPPORTED_NMEA = frozenset({_GGA, _RMC, _GLL})
+_DEFAULT_ENABLED_NMEA = _SUPPORTED_NMEA
+
+# 已知的NMEA talker ID (GPS、多系统组合、GLONASS、Galileo、北斗、QZSS、NavIC)
+_NMEA_TALKER_IDS = frozenset({b'GP', b'GN', b'GL', b'GA', b'GB', b'BD', b'GQ', b'QZ', b'GI'})
+
+# 南纬/西经方向标识 (str、bytes及单字节int形式)
+_NEGATIVE_DIRECTIONS = frozenset({'S', 'W', b'S', b'W', ord('S'), ord('W')})
+
+
+def _iter_lines(buf: bytearray) -> Iterator[memoryview]:
+    """
+    逐行遍历缓冲区中的完整行 (不含'\n')，不复制数据
+
+    迭代结束后从缓冲区移除已遍历的行，未完整的行保留在缓冲区中。
+    产出的memoryview在迭代器前进后即被释放，调用方需在此之前完成使用。
+    """
+    start = 0
+    try:
+        with memoryview(buf) as mv:
+            while True:
+                idx = buf.find(b'\n', start)
+                if idx < 0:
+                    break
+                with mv[start:idx] as line:
+                    yield line
+                start = idx + 1
+    finally:
+        del buf[:start]
+
+
+# NTRIP socket缓冲区大小 (字节)
+_NTRIP_RCVBUF = 262144
+_NTRIP_SNDBUF = 65536
+
+
+def _tune_socket(sock: socket.socket):
+    """
+    调整NTRIP TCP socket参数，需在connect之前调用以使接收窗口生效
+
+    加大接收缓冲区以吸收突发的RTCM数据，禁用Nagle算法避免小的RTCM/GGA数据包被延迟发送。
+    """
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _NTRIP_RCVBUF)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, _NTRIP_SNDBUF)
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
 
 class FixQuality(Enum):
     """定位质量枚举"""
@@ -132,13 +189,38 @@ class NMEAParser:
         """
         self.position = GPSPosition()
         self.callbacks = {}
+        # 常用消息类型的回调直接缓存为属性，避免每条语句查字典
+        self._cb_gga = None
+        self._cb_rmc = None
+        self._cb_gll = None
         # 设置启用的消息类型，默认解析所有支持的类型
-        self.enabled_messages = set(enabled_messages) if enabled_messages else {'GGA', 'RMC', 'GLL'}
-        self.supported_messages = {'GGA', 'RMC', 'GLL'}  # 当前支持的消息类型
+        self.supported_messages = _SUPPORTED_NMEA  # 当前支持的消息类型
+        self._set_enabled(frozenset(enabled_messages) & _SUPPORTED_NMEA
+                          if enabled_messages else _DEFAULT_ENABLED_NMEA)
+        fastpath.warmup()
     
     def register_callback(self, message_type: str, callback: Callable):
         """注册消息回调函数"""
         self.callbacks[message_type] = callback
+        self._cb_gga = self.callbacks.get(_GGA)
+        self._cb_rmc = self.callbacks.get(_RMC)
+        self._cb_gll = self.callbacks.get(_GLL)
+    
+    def _set_enabled(self, enabled_messages: frozenset):
+        """更新启用的消息类型及其字节形式 (供原始字节预过滤使用)"""
+        self.enabled_messages = enabled_messages
+        self._enabled_types = frozenset(msg.encode('ascii') for msg in enabled_messages)
+    
+    def accepts_sentence(self, sentence: Union[bytes, bytearray, memoryview]) -> bool:
+        """
+        根据原始字节的前6个字符快速判断是否需要解析该语句
+        
+        只接受已知talker ID且消息类型已启用的语句，无需解码或拆分字段
+        """
+        head = bytes(sentence[:6])
+        return (len(head) == 6 and head[0] == 0x24  # '$'
+                and head[1:3] in _NMEA_TALKER_IDS
+                and head[3:6] in self._enabled_types)
     
     def calculate_checksum(self, sentence: str) -> str:
         """计算NMEA校验和"""
@@ -160,26 +242,18 @@ class NMEAParser:
             if len(checksum) != 2:
                 return False
                 
-            calculated = self.calculate_checksum(data[1:])  # 去掉$符号
-            return calculated == checksum.upper()
+            calculated = fastpath.nmea_xor(data[1:].encode('ascii'))  # 去掉$符号
+            return f"{calculated:02X}" == checksum.upper()
         except (ValueError, IndexError):
             return False
     
-    def parse_coordinate(self, coord_str: str, direction: str) -> float:
-        """解析坐标格式 (DDMM.MMMM)"""
+    def parse_coordinate(self, coord_str: Union[str, bytes], direction: Union[str, bytes, int]) -> float:
+        """解析坐标格式 (DDMM.MMMM)，坐标和方向可以是str或bytes"""
         if not coord_str or not direction:
             return 0.0
         
         try:
-            coord = float(coord_str)
-            degrees = int(coord / 100)
-            minutes = coord - (degrees * 100)
-            decimal_degrees = degrees + (minutes / 60)
-            
-            if direction in ['S', 'W']:
-                decimal_degrees = -decimal_degrees
-            
-            return decimal_degrees
+            return fastpath.parse_coord(coord_str, direction in _NEGATIVE_DIRECTIONS)
         except ValueError:
             return 0.0
     
@@ -339,23 +413,28 @@ class NMEAParser:
             sentence = sentence.split('*')[0]
         
         fields = sentence.split(',')
-        message_type = fields[0][3:]  # 去掉$GP前缀
+        message_type = sys.intern(fields[0][3:])  # 去掉$GP前缀
         
         # 检查是否启用了该消息类型
         if message_type not in self.enabled_messages:
             return None
         
         position = None
-        if message_type == 'GGA':
+        if message_type is _GGA:
             position = self.parse_gga(fields)
-        elif message_type == 'RMC':
+            callback = self._cb_gga
+        elif message_type is _RMC:
             position = self.parse_rmc(fields)
-        elif message_type == 'GLL':
+            callback = self._cb_rmc
+        elif message_type is _GLL:
             position = self.parse_gll(fields)
+            callback = self._cb_gll
+        else:
+            callback = self.callbacks.get(message_type)
         
         # 调用回调函数
-        if message_type in self.callbacks:
-            self.callbacks[message_type](fields, position)
+        if callback is not None:
+            callback(fields, position)
         
         return position
     
@@ -367,8 +446,7 @@ class NMEAParser:
             enabled_messages: 启用的消息类型列表，如['GGA', 'RMC']
         """
         # 只启用支持的消息类型
-        valid_messages = [msg for msg in enabled_messages if msg in self.supported_messages]
-        self.enabled_messages = set(valid_messages)
+        self._set_enabled(frozenset(enabled_messages) & self.supported_messages)
         logger.info(f"已设置启用的NMEA消息类型: {list(self.enabled_messages)}")
     
     def get_enabled_messages(self) -> List[str]:
@@ -383,88 +461,124 @@ class NMEAParser:
 class RTCMParser:
     """RTCM协议解析器"""
     
+    BUFFER_SIZE = 65536
+    
     def __init__(self):
-        self.buffer = bytearray()
+        # 固定容量接收缓冲区, [_r, _w) 为待解析数据
+        self.buffer = bytearray(self.BUFFER_SIZE)
+        self._r = 0
+        self._w = 0
         self.callbacks = {}
+        # 常用消息类型的回调直接缓存为属性，避免每帧查字典
+        self._cb_1005 = None
+        self._cb_1077 = None
+        fastpath.warmup()
     
     def register_callback(self, message_type: int, callback: Callable):
         """注册消息回调函数"""
         self.callbacks[message_type] = callback
+        self._cb_1005 = self.callbacks.get(1005)
+        self._cb_1077 = self.callbacks.get(1077)
     
     def crc24(self, data: bytes) -> int:
         """计算CRC24校验"""
-        crc = 0
-        for byte in data:
-            crc ^= byte << 16
-            for _ in range(8):
-                if crc & 0x800000:
-                    crc = (crc << 1) ^ 0x1864CFB
-                else:
-                    crc <<= 1
-                crc &= 0xFFFFFF
-        return crc
+        return fastpath.crc24q(data)
+    
+    def _write(self, data: bytes):
+        """将数据写入缓冲区尾部，空间不足时先压缩，仍不足时扩容"""
+        n = len(data)
+        if self._w + n > len(self.buffer):
+            self._compact()
+            if self._w + n > len(self.buffer):
+                self.buffer.extend(bytes(self._w + n - len(self.buffer)))
+        self.buffer[self._w:self._w + n] = data
+        self._w += n
+    
+    def _compact(self):
+        """将未解析数据移动到缓冲区起始位置"""
+        pending = self._w - self._r
+        if pending and self._r:
+            self.buffer[:pending] = self.buffer[self._r:self._w]
+        self._r = 0
+        self._w = pending
     
     def parse_message(self, data: bytes) -> List[Dict]:
         """解析RTCM消息"""
         messages = []
-        self.buffer.extend(data)
+        self._write(data)
+        buffer = self.buffer
+        pos = self._r
+        end = self._w
         
-        while len(self.buffer) >= 3:
-            # 查找RTCM帧头 (0xD3)
-            start_idx = -1
-            for i in range(len(self.buffer)):
-                if self.buffer[i] == 0xD3:
-                    start_idx = i
-                    break
-            
-            if start_idx == -1:
-                self.buffer.clear()
-                break
-            
-            if start_idx > 0:
-                self.buffer = self.buffer[start_idx:]
-            
-            if len(self.buffer) < 6:
-                break
-            
-            # 解析消息长度
-            length = ((self.buffer[1] & 0x03) << 8) | self.buffer[2]
-            total_length = length + 6  # 3字节头 + 数据 + 3字节CRC
-            
-            if len(self.buffer) < total_length:
-                break
-            
-            # 提取完整消息
-            message_data = bytes(self.buffer[:total_length])
-            self.buffer = self.buffer[total_length:]
-            
-            # 验证CRC
-            payload = message_data[3:-3]
-            received_crc = struct.unpack('>I', b'\x00' + message_data[-3:])[0]
-            calculated_crc = self.crc24(message_data[:-3])
-            
-            if received_crc != calculated_crc:
-                logger.warning("RTCM CRC校验失败")
-                continue
-            
-            # 解析消息类型
-            if len(payload) >= 2:
-                message_type = struct.unpack('>H', payload[:2])[0] >> 4
-                
-                message_info = {
-                    'type': message_type,
-                    'length': length,
-                    'data': payload,
-                    'timestamp': datetime.now()
-                }
-                
-                messages.append(message_info)
-                
-                # 调用回调函数
-                if message_type in self.callbacks:
-                    self.callbacks[message_type](message_info)
-                
-                logger.debug(f"收到RTCM消息类型: {message_type}, 长度: {length}")
+        try:
+            with memoryview(buffer) as mv:
+                while end - pos >= 3:
+                    # 查找RTCM帧头 (0xD3)
+                    start_idx = buffer.find(b'\xd3', pos, end)
+                    if start_idx == -1:
+                        pos = end
+                        break
+                    pos = start_idx
+                    
+                    if end - pos < 6:
+                        break
+                    
+                    # 解析消息长度 (10位)
+                    length = struct.unpack_from('>H', mv, pos + 1)[0] & 0x03FF
+                    total_length = length + 6  # 3字节头 + 数据 + 3字节CRC
+                    
+                    if end - pos < total_length:
+                        break
+                    
+                    # 提取完整消息 (零拷贝视图)
+                    with mv[pos:pos + total_length] as frame:
+                        pos += total_length
+                        
+                        # 验证CRC
+                        received_crc = int.from_bytes(frame[-3:], 'big')
+                        calculated_crc = self.crc24(frame[:-3])
+                        
+                        if received_crc != calculated_crc:
+                            logger.warning("RTCM CRC校验失败")
+                            continue
+                        
+                        # 解析消息类型
+                        if length < 2:
+                            continue
+                        message_type = struct.unpack_from('>H', frame, 3)[0] >> 4
+                        payload = bytes(frame[3:-3])
+                    
+                    message_info = {
+                        'type': message_type,
+                        'length': length,
+                        'data': payload,
+                        'timestamp': datetime.now()
+                    }
+                    
+                    messages.append(message_info)
+                    
+                    # 调用回调函数
+                    if message_type == 1077:
+                        callback = self._cb_1077
+                    elif message_type == 1005:
+                        callback = self._cb_1005
+                    else:
+                        callback = self.callbacks.get(message_type)
+                    if callback is not None:
+                        callback(message_info)
+                    
+                    logger.debug(f"收到RTCM消息类型: {message_type}, 长度: {length}")
+        finally:
+            # 消费帧只移动读指针，读指针越过一半容量时才压缩
+            if pos >= self._w:
+                self._r = self._w = 0
+                # 超大数据块导致的扩容在数据处理完后恢复为固定容量
+                if len(buffer) > self.BUFFER_SIZE:
+                    del buffer[self.BUFFER_SIZE:]
+            else:
+                self._r = pos
+                if pos > len(buffer) // 2:
+                    self._compact()
         
         return messages
 
@@ -479,12 +593,17 @@ class SerialCommunicator:
         self.serial_conn = None
         self.is_connected = False
         self.read_thread = None
+        self.dispatch_thread = None
         self.stop_event = threading.Event()
         self.data_callbacks = []
+        self._data_callbacks_tuple: Tuple[Callable[[bytes], None], ...] = ()
+        # 读取线程只负责收数据入队，回调在分发线程中执行
+        self._rx_q: queue.SimpleQueue = queue.SimpleQueue()
     
     def add_data_callback(self, callback: Callable[[bytes], None]):
         """添加数据接收回调函数"""
         self.data_callbacks.append(callback)
+        self._data_callbacks_tuple = (*self._data_callbacks_tuple, callback)
     
     def connect(self) -> bool:
         """连接串口"""
@@ -500,8 +619,11 @@ class SerialCommunicator:
             self.is_connected = True
             logger.info(f"串口连接成功: {self.port}")
             
-            # 启动读取线程
+            # 启动分发线程和读取线程
             self.stop_event.clear()
+            self._rx_q = queue.SimpleQueue()
+            self.dispatch_thread = threading.Thread(target=self._dispatch_loop, daemon=True)
+            self.dispatch_thread.start()
             self.read_thread = threading.Thread(target=self._read_loop, daemon=True)
             self.read_thread.start()
             
@@ -516,6 +638,11 @@ class SerialCommunicator:
         if self.read_thread:
             self.read_thread.join(timeout=2.0)
         
+        # 通知分发线程退出 (已入队的数据会先处理完)
+        self._rx_q.put(None)
+        if self.dispatch_thread:
+            self.dispatch_thread.join(timeout=2.0)
+        
         if self.serial_conn and self.serial_conn.is_open:
             self.serial_conn.close()
         
@@ -541,21 +668,42 @@ class SerialCommunicator:
     
     def _read_loop(self):
         """数据读取循环"""
-        while not self.stop_event.is_set() and self.is_connected:
+        is_stopped = self.stop_event.is_set
+        put = self._rx_q.put
+        while not is_stopped() and self.is_connected:
             try:
                 if self.serial_conn and self.serial_conn.in_waiting > 0:
                     data = self.serial_conn.read(self.serial_conn.in_waiting)
                     if data:
-                        for callback in self.data_callbacks:
-                            try:
-                                callback(data)
-                            except Exception as e:
-                                logger.error(f"数据回调函数执行失败: {e}")
+                        put(data)
                 
                 time.sleep(0.01)  # 避免CPU占用过高
             except Exception as e:
                 logger.error(f"串口读取错误: {e}")
                 break
+        
+        put(None)
+    
+    def _dispatch_loop(self):
+        """数据分发循环，在独立线程中执行回调，避免解析阻塞串口读取"""
+        get = self._rx_q.get
+        while True:
+            data = get()
+            if data is None:
+                break
+            
+            callbacks = self._data_callbacks_tuple
+            if len(callbacks) == 1:
+                try:
+                    callbacks[0](data)
+                except Exception as e:
+                    logger.error(f"数据回调函数执行失败: {e}")
+            else:
+                for callback in callbacks:
+                    try:
+                        callback(data)
+                    except Exception as e:
+                        logger.error(f"数据回调函数执行失败: {e}")
 
 
 class NTRIPClient:
@@ -573,16 +721,29 @@ class NTRIPClient:
         self.receive_thread = None
         self.stop_event = threading.Event()
         self.data_callbacks = []
+        self._data_callbacks_tuple: Tuple[Callable[[bytes], None], ...] = ()
+        self.disconnect_callbacks = []
     
     def add_data_callback(self, callback: Callable[[bytes], None]):
         """添加数据接收回调函数"""
         self.data_callbacks.append(callback)
+        self._data_callbacks_tuple = (*self._data_callbacks_tuple, callback)
     
-    def connect(self) -> bool:
-        """连接NTRIP服务器"""
+    def add_disconnect_callback(self, callback: Callable[[], None]):
+        """添加连接意外断开时的回调函数 (主动调用disconnect时不触发)"""
+        self.disconnect_callbacks.append(callback)
+    
+    def connect(self, start_receiver: bool = True) -> bool:
+        """
+        连接NTRIP服务器
+        
+        Args:
+            start_receiver: 是否启动内部接收线程；为False时由调用方直接从self.socket读取数据
+        """
         try:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
             self.socket.settimeout(10.0)
+            _tune_socket(self.socket)
             self.socket.connect((self.host, self.port))
             
             # 构建HTTP请求
@@ -614,8 +775,9 @@ class NTRIPClient:
             
             # 启动接收线程
             self.stop_event.clear()
-            self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
-            self.receive_thread.start()
+            if start_receiver:
+                self.receive_thread = threading.Thread(target=self._receive_loop, daemon=True)
+                self.receive_thread.start()
             
             return True
             
@@ -635,29 +797,50 @@ class NTRIPClient:
         self.is_connected = False
         logger.info("NTRIP连接已断开")
     
-    def send_gga(self, gga_sentence: str):
-        """发送GGA语句到NTRIP服务器"""
+    def send_gga(self, gga_sentence: Union[str, bytes]):
+        """
+        发送GGA语句到NTRIP服务器
+        
+        Args:
+            gga_sentence: GGA语句字符串(自动追加CRLF)，或已编码且以CRLF结尾的bytes
+        """
         if not self.is_connected or not self.socket:
             return
         
+        if isinstance(gga_sentence, str):
+            gga_sentence = gga_sentence.encode('ascii') + b'\r\n'
+        
         try:
-            self.socket.send(gga_sentence.encode() + b'\r\n')
+            self.socket.send(gga_sentence)
         except Exception as e:
             logger.error(f"发送GGA失败: {e}")
     
     def _receive_loop(self):
         """数据接收循环"""
-        while not self.stop_event.is_set() and self.is_connected:
+        is_stopped = self.stop_event.is_set
+        sock = self.socket
+        # Linux下每次接收后重新开启快速ACK，避免延迟确认合并
+        quickack = getattr(socket, 'TCP_QUICKACK', None)
+        while not is_stopped() and self.is_connected:
             try:
-                data = self.socket.recv(4096)
+                data = sock.recv(4096)
                 if not data:
                     break
+                if quickack is not None:
+                    sock.setsockopt(socket.IPPROTO_TCP, quickack, 1)
                 
-                for callback in self.data_callbacks:
+                callbacks = self._data_callbacks_tuple
+                if len(callbacks) == 1:
                     try:
-                        callback(data)
+                        callbacks[0](data)
                     except Exception as e:
                         logger.error(f"NTRIP数据回调函数执行失败: {e}")
+                else:
+                    for callback in callbacks:
+                        try:
+                            callback(data)
+                        except Exception as e:
+                            logger.error(f"NTRIP数据回调函数执行失败: {e}")
                         
             except socket.timeout:
                 continue
@@ -666,6 +849,12 @@ class NTRIPClient:
                 break
         
         self.is_connected = False
+        if not is_stopped():
+            for callback in self.disconnect_callbacks:
+                try:
+                    callback()
+                except Exception as e:
+                    logger.error(f"NTRIP断开回调函数执行失败: {e}")
 
 
 class MockNTRIPClient(NTRIPClient):
@@ -675,8 +864,14 @@ class MockNTRIPClient(NTRIPClient):
         super().__init__(host, port, mountpoint, username, password)
         self.mock_thread = None
 
-    def connect(self) -> bool:
-        """连接Mock NTRIP客户端"""
+    def connect(self, start_receiver: bool = True) -> bool:
+        """
+        连接Mock NTRIP客户端
+        
+        Args:
+            start_receiver: 与NTRIPClient.connect保持一致；Mock客户端没有socket可供直接读取，
+                            始终启动模拟线程
+        """
         self.is_connected = True
         logger.info(f"Mock NTRIP客户端连接成功 (模拟模式): {self.host}:{self.port}/{self.mountpoint}")
 
@@ -710,7 +905,7 @@ class MockNTRIPClient(NTRIPClient):
                 crc = self._calculate_crc24(header_payload)
                 full_msg = header_payload + struct.pack('>I', crc)[1:]
 
-                for callback in self.data_callbacks:
+                for callback in self._data_callbacks_tuple:
                     try:
                         callback(full_msg)
                         logger.debug(f"Mock发送数据: {len(full_msg)} bytes")
@@ -724,16 +919,7 @@ class MockNTRIPClient(NTRIPClient):
 
     def _calculate_crc24(self, data: bytes) -> int:
         """计算CRC24校验"""
-        crc = 0
-        for byte in data:
-            crc ^= byte << 16
-            for _ in range(8):
-                if crc & 0x800000:
-                    crc = (crc << 1) ^ 0x1864CFB
-                else:
-                    crc <<= 1
-                crc &= 0xFFFFFF
-        return crc
+        return fastpath.crc24q(data)
 
 class CoordinateConverter:
     """坐标转换工具"""
@@ -806,7 +992,7 @@ class RTKPositioningSystem:
         self.ntrip_client = None
         self.current_position = GPSPosition()
         self.is_running = False
-        self.nmea_buffer = ""  # 添加NMEA数据缓冲区
+        self.nmea_buffer = bytearray()  # 添加NMEA数据缓冲区
         self.logger = logging.getLogger(f"{__name__}.RTKPositioningSystem")
         
         # 初始化PositionHandler
@@ -826,6 +1012,17 @@ class RTKPositioningSystem:
         self.rtcm_parser.register_callback(1005, self._on_rtcm_1005)
         self.rtcm_parser.register_callback(1077, self._on_rtcm_1077)
     
+    @property
+    def default_gga(self) -> str:
+        """默认GGA语句"""
+        return self._default_gga
+    
+    @default_gga.setter
+    def default_gga(self, gga_sentence: str):
+        # 预先编码并追加CRLF，保活时直接发送
+        self._default_gga = gga_sentence
+        self._default_gga_bytes = gga_sentence.encode('ascii') + b'\r\n'
+    
     def configure_serial(self, port: str, baudrate: int = 115200):
         """配置串口通信"""
         if self.serial_comm:
@@ -904,7 +1101,7 @@ class RTKPositioningSystem:
             if self.ntrip_client and self.ntrip_client.is_connected:
                 if current_time - self.last_gga_time > 2:
                     logger.warning("未检测到串口GGA数据输入，发送默认GGA以保持NTRIP连接")
-                    self.ntrip_client.send_gga(self.default_gga)
+                    self.ntrip_client.send_gga(self._default_gga_bytes)
                     
                     # 避免立即重复发送，重置计时器或稍微推后
                     # 这里我们不更新last_gga_time，因为那代表真实收到数据的时间
@@ -942,15 +1139,19 @@ class RTKPositioningSystem:
     def _on_serial_data(self, data: bytes):
         """处理串口数据"""
         try:
-            # 将新数据添加到缓冲区，使用更宽松的错误处理
-            text_data = data.decode('ascii', errors='replace')
-            self.nmea_buffer += text_data
+            # 将新数据添加到缓冲区
+            buffer = self.nmea_buffer
+            buffer.extend(data)
             
             # 处理完整的NMEA消息
-            while '\n' in self.nmea_buffer:
-                line_end = self.nmea_buffer.find('\n')
-                line = self.nmea_buffer[:line_end].strip()
-                self.nmea_buffer = self.nmea_buffer[line_end + 1:]
+            accepts_sentence = self.nmea_parser.accepts_sentence
+            for raw_line in _iter_lines(buffer):
+                # 未知talker或未启用的消息类型直接跳过，不做解码和校验
+                if not accepts_sentence(raw_line):
+                    continue
+                
+                # 仅在此处为每行创建一次str，使用更宽松的错误处理
+                line = str(raw_line, 'ascii', 'replace').strip()
                 
                 if not line:
                     continue
@@ -975,8 +1176,8 @@ class RTKPositioningSystem:
                             self.logger.debug(f"解析NMEA消息失败: {e}")
             
             # 防止缓冲区过大
-            if len(self.nmea_buffer) > 10000:
-                self.nmea_buffer = self.nmea_buffer[-5000:]
+            if len(buffer) > 10000:
+                del buffer[:-5000]
                 self.logger.warning("NMEA缓冲区过大，已清理")
                 
         except Exception as e:
@@ -1022,7 +1223,7 @@ class RTKPositioningSystem:
             # 添加了这条日志，方便调试
             logger.info(f"收到GGA消息但定位无效 (Quality: {position.fix_quality.name if position else 'None'}), 发送默认GGA以保持NTRIP连接")
             if self.ntrip_client and self.ntrip_client.is_connected:
-                self.ntrip_client.send_gga(self.default_gga)
+                self.ntrip_client.send_gga(self._default_gga_bytes)
 
     def _on_rmc_received(self, fields: List[str], position: GPSPosition):
         """RMC消息回调"""
@@ -12,68 +12,61 @@ import socket
 import shutil
 import serial.tools.list_ports
 import platform
-import subprocess
+from concurrent.futures import ThreadPoolExecutor
 
-def check_serial_ports():
-    print("\n[1] 检查串口设备...")
+def check_serial_ports(log=print):
+    log("\n[1] 检查串口设备...")
     ports = serial.tools.list_ports.comports()
     if not ports:
-        print("❌ 未发现任何串口设备!")
+        log("❌ 未发现任何串口设备!")
         return False
     
-    print(f"发现 {len(ports)} 个串口设备:")
+    log(f"发现 {len(ports)} 个串口设备:")
     for port in ports:
-        print(f"  - {port.device}: {port.description} [{port.hwid}]")
+        log(f"  - {port.device}: {port.description} [{port.hwid}]")
     return True
 
-def check_internet():
-    print("\n[2] 检查网络连接...")
+def check_internet(log=print):
+    log("\n[2] 检查网络连接...")
     
-    # Check DNS/Ping
+    # Check reachability with a TCP connect (no subprocess, no platform-specific ping flags)
     host = "8.8.8.8"
-    print(f"  正在 Ping {host} ...")
-    
-    param = '-n' if platform.system().lower() == 'windows' else '-c'
-    command = ['ping', param, '1', host]
+    log(f"  正在连接 {host}:53 ...")
     
     try:
-        result = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        if result.returncode == 0:
-            print("  ✅ 互联网连接正常 (Ping成功)")
-        else:
-            print("  ❌ 互联网连接失败 (Ping超时)")
-            return False
-    except Exception as e:
-        print(f"  ❌ 执行Ping命令失败: {e}")
+        socket.create_connection((host, 53), timeout=1.0).close()
+        log("  ✅ 互联网连接正常 (TCP连接成功)")
+    except OSError as e:
+        log(f"  ❌ 互联网连接失败 ({e})")
         return False
         
     # Check DNS resolution
     try:
         socket.gethostbyname("www.google.com")
-        print("  ✅ DNS解析正常")
+        log("  ✅ DNS解析正常")
     except:
-        print("  ⚠️ DNS解析失败 (可能无法连接域名)")
+        log("  ⚠️ DNS解析失败 (可能无法连接域名)")
         
     return True
 
-def check_disk_space():
-    print("\n[3] 检查磁盘空间...")
+def check_disk_space(log=print):
+    log("\n[3] 检查磁盘空间...")
     try:
         # Get current directory drive
         current_drive = os.path.abspath(__file__)[:3] if platform.system() == 'Windows' else '/'
         total, used, free = shutil.disk_usage(current_drive)
         
         free_gb = free // (2**30)
-        print(f"  当前磁盘可用空间: {free_gb} GB")
+        log(f"  当前磁盘可用空间: {free_gb} GB")
         
         if free_gb < 1:
-            print("  ❌ 磁盘空间不足 (<1GB)!")
+            log("  ❌ 磁盘空间不足 (<1GB)!")
             return False
         else:
-            print("  ✅ 磁盘空间充足")
+            log("  ✅ 磁盘空间充足")
             return True
     except Exception as e:
-        print(f"  检查磁盘失败: {e}")
+        log(f"  检查磁盘失败: {e}")
         return False
 
 def main():
@@ -81,11 +74,23 @@ def main():
     print("RTK系统 户外环境自检程序")
     print("=" * 50)
     
-    status = True
+    # The checks are independent and mostly wait on I/O, so run them concurrently.
+    # Each check buffers its output, which is printed afterwards in order.
+    checks = [check_serial_ports, check_internet, check_disk_space]
+    
+    def run_check(check):
+        lines = []
+        ok = check(lambda msg="": lines.append(msg))
+        return ok, lines
     
-    if not check_serial_ports(): status = False
-    if not check_internet(): status = False
-    if not check_disk_space(): status = False
+    with ThreadPoolExecutor(max_workers=len(checks)) as executor:
+        results = list(executor.map(run_check, checks))
+    
+    status = True
+    for ok, lines in results:
+        for line in lines:
+            print(line)
+        if not ok: status = False
     
     print("\n" + "=" * 50)
     if status:
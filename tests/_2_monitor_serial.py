@@ -21,32 +21,29 @@ def monitor(port, baudrate=115200):
     print("-" * 50)
     
     try:
-        ser = serial.Serial(port, baudrate, timeout=1)
+        # Short timeout keeps Ctrl+C responsive; readline blocks without polling
+        ser = serial.Serial(port, baudrate, timeout=0.1)
         
         while True:
-            if ser.in_waiting:
-                try:
-                    # Try to read a line
-                    line = ser.readline()
-                    
-                    # Try to decode as ASCII/UTF-8
-                    try:
-                        decoded = line.decode('utf-8', errors='replace').strip()
-                        print(f"[{time.strftime('%H:%M:%S')}] {decoded}")
-                        
-                        # Simple heuristic for baud rate check
-                        if len(decoded) > 5 and all(c == '\x00' or c == '' for c in decoded):
-                             print("⚠️  警告: 收到大量乱码，可能是波特率设置错误！")
-                             
-                    except Exception:
-                        print(f"[{time.strftime('%H:%M:%S')}] RAW: {line}")
-                        
-                except Exception as e:
-                    print(f"读取错误: {e}")
-            else:
-                time.sleep(0.01)
+            # Blocks until a full line arrives or the timeout expires;
+            # port errors (e.g. device unplugged) end the monitor via the outer handler
+            line = ser.readline()
+            if not line:
+                continue
+            
+            # Try to decode as ASCII/UTF-8
+            try:
+                decoded = line.decode('utf-8', errors='replace').strip()
+                print(f"[{time.strftime('%H:%M:%S')}] {decoded}")
                 
-    except serial.SerialException as e:
+                # Simple heuristic for baud rate check
+                if len(decoded) > 5 and all(c == '\x00' or c == '' for c in decoded):
+                     print("⚠️  警告: 收到大量乱码，可能是波特率设置错误！")
+                     
+            except Exception:
+                print(f"[{time.strftime('%H:%M:%S')}] RAW: {line}")
+                
+    except (serial.SerialException, OSError) as e:
         print(f"❌ 串口错误: {e}")
     except KeyboardInterrupt:
         print("\n已停止监控")
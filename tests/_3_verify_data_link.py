@@ -1,5 +1,6 @@
 
 import time
+import struct
 import logging
 import threading
 import sys
@@ -19,6 +20,7 @@ class MockSerialCommunicator:
     """Mock serial communicator to capture output data"""
     def __init__(self):
         self.received_data = bytearray()
+        self._pos = 0
         self.is_connected = False
         self.lock = threading.Lock()
         
@@ -29,18 +31,56 @@ class MockSerialCommunicator:
     def disconnect(self):
         self.is_connected = False
         
+    def reserve(self, n: int):
+        """Preallocate the capture buffer for an expected total of n bytes"""
+        with self.lock:
+            self.received_data = bytearray(n)
+            self._pos = 0
+            
     def send_data(self, data: bytes):
         """Capture data sent to serial port"""
         with self.lock:
-            self.received_data.extend(data)
+            end = self._pos + len(data)
+            # Writes in place while within the reserved size, grows past it
+            self.received_data[self._pos:end] = data
+            self._pos = end
+        return True
             
     def get_received_data(self) -> bytes:
         with self.lock:
-            return bytes(self.received_data)
+            return bytes(self.received_data[:self._pos])
             
-    def clear_buffer(self):
+    def received_length(self) -> int:
         with self.lock:
-            self.received_data = bytearray()
+            return self._pos
+            
+    def equals(self, other: bytes) -> bool:
+        """Compare captured data in place without copying the buffer"""
+        with self.lock:
+            with memoryview(self.received_data)[:self._pos] as captured:
+                return captured == other
+
+def build_rtcm_frame(rtcm_parser, payload: bytes) -> bytes:
+    """构造带正确CRC24Q的RTCM帧"""
+    header = b'\xd3' + struct.pack('>H', len(payload))
+    crc = rtcm_parser.crc24(header + payload)
+    return header + payload + crc.to_bytes(3, 'big')
+
+def rtcm_frame_lengths(data: bytes) -> List[int]:
+    """
+    Reference RTCM header parsing: read preamble + 10-bit length with a single
+    struct.unpack_from call (as RTCMParser does) and walk back-to-back frames
+    """
+    lengths = []
+    offset = 0
+    while offset + 3 <= len(data):
+        preamble, length = struct.unpack_from('>BH', data, offset)
+        if preamble != 0xD3:
+            break
+        length &= 0x03FF
+        lengths.append(length)
+        offset += length + 6
+    return lengths
 
 def verify_link():
     print("=" * 60)
@@ -63,18 +103,30 @@ def verify_link():
         {
             "name": "完整单包传输",
             "chunks": [b'\xd3\x00\x04\x01\x02\x03\x04\x12\x34\x56'], # A valid-looking RTCM packet
+            "rtcm_lengths": [4],
             "desc": "发送一个完整的RTCM包"
         },
         {
             "name": "分包传输 (Fragmentation)",
             "chunks": [b'\xd3\x00\x04\xAA', b'\xBB\xCC\xDD\xEE\xFF\x99'], # Split in middle
+            "rtcm_lengths": [4],
             "desc": "模拟网络分包：先发送头部和部分数据，再发送剩余数据"
         },
         {
             "name": "多包粘连 (Coalescence)",
             "chunks": [b'\xd3\x00\x04\x11\x11\x11\x11\xAA\xAA\xAA' + b'\xd3\x00\x04\x22\x22\x22\x22\xBB\xBB\xBB'],
+            "rtcm_lengths": [4, 4],
             "desc": "模拟TCP粘包：一次性收到两个RTCM包"
         },
+        {
+            "name": "大数据量粘连 (Bulk Coalescence)",
+            "chunks": [b"".join(
+                b'\x00\x55' * (i % 4) + build_rtcm_frame(rtk.rtcm_parser, struct.pack('>H', 1077 << 4) + bytes(range(198)))
+                for i in range(200)
+            )],
+            "rtcm_counts": {1077: 200},
+            "desc": "一次性收到200个MSM7大小的RTCM包(夹杂干扰字节)，覆盖帧头扫描路径"
+        },
         {
             "name": "非RTCM垃圾数据",
             "chunks": [b'Not RTCM Data', b' garbage \n'],
@@ -88,11 +140,20 @@ def verify_link():
         print(f"\n测试用例 {i+1}: {case['name']}")
         print(f"描述: {case['desc']}")
         
-        # Clear buffer
-        mock_serial.clear_buffer()
-        
-        # Calculate expected total data
+        # Calculate expected total data and preallocate the capture buffer
         expected_data = b"".join(case['chunks'])
+        mock_serial.reserve(len(expected_data))
+        
+        # Check the header length fields with the struct-based reference parser
+        if 'rtcm_lengths' in case:
+            lengths = rtcm_frame_lengths(expected_data)
+            print(f"帧长度字段: {lengths}")
+            if lengths != case['rtcm_lengths']:
+                print(f"❌ 验证失败: 帧长度字段应为 {case['rtcm_lengths']}")
+                continue
+        
+        # Snapshot parser statistics so the case can check how many frames it decoded
+        stats_before = dict(rtk.rtcm_stats)
         
         # Simulate data arrival
         for chunk in case['chunks']:
@@ -101,15 +162,22 @@ def verify_link():
             rtk._on_ntrip_data(chunk)
             
         # Verify
-        received = mock_serial.get_received_data()
-        
         print(f"发送数据量: {len(expected_data)} bytes")
-        print(f"接收数据量: {len(received)} bytes")
+        print(f"接收数据量: {mock_serial.received_length()} bytes")
+        
+        # Forwarding alone passes even if the parser drops every frame, so check decoded counts too
+        if 'rtcm_counts' in case:
+            decoded = {t: rtk.rtcm_stats.get(t, 0) - stats_before.get(t, 0) for t in case['rtcm_counts']}
+            print(f"解析消息数: {decoded}")
+            if decoded != case['rtcm_counts']:
+                print(f"❌ 验证失败: 解析消息数应为 {case['rtcm_counts']}")
+                continue
         
-        if received == expected_data:
+        if mock_serial.equals(expected_data):
             print("✅ 验证通过: 数据完全一致")
             total_passed += 1
         else:
+            received = mock_serial.get_received_data()
             print("❌ 验证失败: 数据不一致")
             print(f"期望: {expected_data.hex().upper()}")
             print(f"实际: {received.hex().upper()}")
@@ -8,14 +8,15 @@ NTRIP功能测试脚本
 import sys
 import os
 import time
-import json
 import logging
+import selectors
 import threading
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.rtk_positioning import NTRIPClient, MockNTRIPClient, SerialCommunicator
+from src.config import load_config_cached
 
 # 配置日志
 logging.basicConfig(
@@ -25,10 +26,26 @@ logging.basicConfig(
 logger = logging.getLogger("NTRIP_TEST")
 
 class NTRIPTester:
+    # 串口发送合并: 最长等待时间(秒)与缓冲上限(字节)
+    TX_FLUSH_INTERVAL = 0.005
+    TX_COALESCE_LIMIT = 512
+    # splice转发中间管道的容量 (Linux默认管道大小)
+    SPLICE_PIPE_SIZE = 65536
+
     def __init__(self, config_file='config.json'):
         self.config = self._load_config(config_file)
         self.client = None
         self.serial = None
+        self._serial_fd = None
+        self._tx_buf = bytearray()
+        self._tx_lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flush_stop = threading.Event()
+        # 缓冲区由空变为非空时置位，刷新线程空闲时阻塞等待
+        self._tx_pending = threading.Event()
+        self._flush_thread = None
+        self._stop = threading.Event()
+        self._gga_bytes = b""
         self.received_bytes = 0
         self.received_packages = 0
         self.start_time = 0
@@ -41,8 +58,7 @@ class NTRIPTester:
             return {}
             
         try:
-            with open(config_file, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_config_cached(config_file)
         except Exception as e:
             logger.error(f"加载配置文件失败: {e}")
             return {}
@@ -61,6 +77,7 @@ class NTRIPTester:
             )
             if self.serial.connect():
                 logger.info(f"串口连接成功: {serial_config.get('port')}")
+                self._serial_fd = self._get_serial_fd()
                 return True
             else:
                 logger.error("串口连接失败")
@@ -69,27 +86,254 @@ class NTRIPTester:
             logger.error(f"串口设置失败: {e}")
             return False
 
+    def _get_serial_fd(self):
+        """获取串口文件描述符，平台不支持时返回None (如Windows)"""
+        try:
+            return self.serial.serial_conn.fileno()
+        except (AttributeError, OSError, ValueError):
+            return None
+
+    def _forward_to_serial(self, data: bytes):
+        """
+        转发数据到串口
+        
+        POSIX平台直接os.write到串口fd，跳过pyserial的写入封装；
+        这绕过了pyserial的写入流程，仅在只有NTRIP线程写串口时适用。
+        写入阻塞或部分写入时回退到send_data。
+        """
+        fd = self._serial_fd
+        if fd is None:
+            self.serial.send_data(data)
+            return
+        try:
+            written = os.write(fd, data)
+        except BlockingIOError:
+            written = 0
+        if written < len(data):
+            self.serial.send_data(data[written:])
+
+    def _flush_tx(self):
+        """将合并缓冲区中的数据一次性写入串口"""
+        with self._flush_lock:
+            with self._tx_lock:
+                if not self._tx_buf:
+                    return
+                data = bytes(self._tx_buf)
+                self._tx_buf.clear()
+            self._forward_to_serial(data)
+
+    def _flush_loop(self):
+        """有待发送数据时等待一个合并间隔后刷新串口发送缓冲区，空闲时不唤醒"""
+        while True:
+            self._tx_pending.wait()
+            # 等待短暂时间以合并后续分片
+            if self._flush_stop.wait(self.TX_FLUSH_INTERVAL):
+                break
+            self._tx_pending.clear()
+            self._flush_tx()
+        self._flush_tx()
+
+    def _start_tx_flusher(self):
+        """启动串口发送合并线程"""
+        self._flush_stop.clear()
+        self._flush_thread = threading.Thread(target=self._flush_loop, daemon=True)
+        self._flush_thread.start()
+
+    def _stop_tx_flusher(self):
+        """停止串口发送合并线程并写出剩余数据"""
+        self._flush_stop.set()
+        self._tx_pending.set()
+        if self._flush_thread:
+            self._flush_thread.join(timeout=1.0)
+            self._flush_thread = None
+        self._flush_tx()
+
     def on_data_received(self, data: bytes):
         """数据接收回调"""
-        self.received_bytes += len(data)
+        # 转发到串口 (短小分片先合并，由刷新线程或缓冲满时写出)
+        serial_comm = self.serial
+        if serial_comm and serial_comm.is_connected:
+            tx_buf = self._tx_buf
+            with self._tx_lock:
+                was_empty = not tx_buf
+                tx_buf += data
+                full = len(tx_buf) >= self.TX_COALESCE_LIMIT
+            if full:
+                self._flush_tx()
+            elif was_empty:
+                self._tx_pending.set()
+        
+        self._record_received(len(data), data)
+
+    def _record_received(self, size: int, data: bytes = b"", _time=time.time, _debug=logging.DEBUG):
+        """
+        统计接收数据并输出进度 (time.time等通过默认参数绑定为局部变量)
+        
+        Args:
+            size: 本次接收字节数
+            data: 接收的数据，仅用于DEBUG输出；内核转发模式下为空
+        """
+        self.received_bytes += size
         self.received_packages += 1
-        self.last_data_time = time.time()
+        self.last_data_time = _time()
         
-        # 转发到串口
-        if self.serial and self.serial.is_connected:
-            self.serial.send_data(data)
-            
-        # 打印少量数据用于调试 (前16字节)
-        hex_data = " ".join([f"{b:02X}" for b in data[:16]])
-        if len(data) > 16:
-            hex_data += "..."
-        # logger.debug(f"收到数据: {len(data)} bytes | {hex_data}")
+        # 打印少量数据用于调试 (前16字节)，仅在DEBUG级别构造
+        if data and logger.isEnabledFor(_debug):
+            hex_data = data[:16].hex(" ").upper()
+            if len(data) > 16:
+                hex_data += "..."
+            logger.debug(f"收到数据: {len(data)} bytes | {hex_data}")
         # 每接收10个包打印一次，避免刷屏
         if self.received_packages % 10 == 0:
-             print(f"\r已接收: {self.received_packages} 包, {self.received_bytes} 字节...", end="", flush=True)
+            sys.stdout.write(f"\r已接收: {self.received_packages} 包, {self.received_bytes} 字节...")
+            sys.stdout.flush()
+
+    def _bridge_loop(self, duration):
+        """
+        单线程桥接NTRIP数据到串口 (不经过接收线程和回调)
+        
+        用selectors同时等待NTRIP socket可读与串口fd可写：收到数据后直接os.write到串口，
+        未写完的部分在串口可写时继续写出。
+        
+        Returns:
+            连接是否意外断开
+        """
+        sock = self.client.socket
+        fd = self._serial_fd
+        pending = bytearray()
+        watching_write = False
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ)
+        deadline = time.time() + duration
+        try:
+            while True:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    return False
+                for key, _ in sel.select(timeout):
+                    if key.fileobj is sock:
+                        try:
+                            data = sock.recv(65536)
+                        except OSError as e:
+                            logger.error(f"NTRIP接收错误: {e}")
+                            return True
+                        if not data:
+                            return True
+                        pending += data
+                        self._record_received(len(data), data)
+                
+                if pending:
+                    try:
+                        written = os.write(fd, pending)
+                    except BlockingIOError:
+                        written = 0
+                    del pending[:written]
+                
+                # 仅在有待写数据时关注串口可写事件
+                if pending and not watching_write:
+                    sel.register(fd, selectors.EVENT_WRITE)
+                    watching_write = True
+                elif not pending and watching_write:
+                    sel.unregister(fd)
+                    watching_write = False
+        finally:
+            sel.close()
+            if pending:
+                self.serial.send_data(bytes(pending))
+
+    def _splice_loop(self, duration):
+        """
+        Linux下用os.splice在内核中转发NTRIP数据到串口，数据不经过用户态
+        
+        splice要求一端为管道，因此经中间管道转发: socket -> pipe -> 串口fd。
+        此模式只统计字节数，不输出数据内容。若内核不支持splice写入串口，
+        将管道中的数据写出后回退到selectors桥接。
+        
+        Returns:
+            连接是否意外断开
+        """
+        sock = self.client.socket
+        sock_fd = sock.fileno()
+        fd = self._serial_fd
+        pipe_r, pipe_w = os.pipe()
+        os.set_blocking(pipe_r, False)
+        os.set_blocking(pipe_w, False)
+        in_pipe = 0
+        # 管道实际容量按页计 (默认16个缓冲区)，小TCP分段会在达到SPLICE_PIPE_SIZE之前填满管道
+        pipe_full = False
+        watching_read = True
+        watching_write = False
+        sel = selectors.DefaultSelector()
+        sel.register(sock, selectors.EVENT_READ)
+        deadline = time.time() + duration
+        try:
+            while True:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    return False
+                for key, _ in sel.select(timeout):
+                    if key.fileobj is sock:
+                        try:
+                            n = os.splice(sock_fd, pipe_w, self.SPLICE_PIPE_SIZE - in_pipe)
+                        except BlockingIOError:
+                            # 管道已满，暂停读取socket直到串口写出部分数据
+                            pipe_full = in_pipe > 0
+                            continue
+                        except OSError as e:
+                            logger.error(f"NTRIP接收错误: {e}")
+                            return True
+                        if n == 0:
+                            return True
+                        in_pipe += n
+                        self._record_received(n)
+                
+                if in_pipe:
+                    try:
+                        n = os.splice(pipe_r, fd, in_pipe)
+                    except BlockingIOError:
+                        pass
+                    except OSError as e:
+                        logger.warning(f"串口不支持splice写入，回退到selectors桥接: {e}")
+                        if in_pipe:
+                            self.serial.send_data(os.read(pipe_r, in_pipe))
+                            in_pipe = 0
+                        sel.close()
+                        return self._bridge_loop(deadline - time.time())
+                    else:
+                        in_pipe -= n
+                        if n:
+                            pipe_full = False
+                
+                # 管道满时暂停读取socket，管道有数据时关注串口可写事件
+                if (not pipe_full and in_pipe < self.SPLICE_PIPE_SIZE) != watching_read:
+                    watching_read = not watching_read
+                    if watching_read:
+                        sel.register(sock, selectors.EVENT_READ)
+                    else:
+                        sel.unregister(sock)
+                if bool(in_pipe) != watching_write:
+                    watching_write = not watching_write
+                    if watching_write:
+                        sel.register(fd, selectors.EVENT_WRITE)
+                    else:
+                        sel.unregister(fd)
+        finally:
+            sel.close()
+            if in_pipe:
+                self.serial.send_data(os.read(pipe_r, in_pipe))
+            os.close(pipe_r)
+            os.close(pipe_w)
 
-    def run_test(self, duration=10, force_real=False):
-        """运行测试"""
+    def run_test(self, duration=10, force_real=False, use_selector=False, use_splice=False):
+        """
+        运行测试
+        
+        Args:
+            duration: 测试时长(秒)
+            force_real: 强制使用真实连接
+            use_selector: 真实连接且串口fd可用时，使用selectors单线程桥接转发
+            use_splice: 同上，Linux下进一步使用os.splice在内核中转发
+        """
         ntrip_config = self.config.get('ntrip', {})
         
         if not ntrip_config:
@@ -97,7 +341,7 @@ class NTRIPTester:
             return
 
         # 先连接串口
-        self._setup_serial()
+        serial_ok = self._setup_serial()
 
         host = ntrip_config.get('host')
         port = ntrip_config.get('port')
@@ -110,14 +354,25 @@ class NTRIPTester:
         if force_real:
             use_mock = False
             logger.info("强制使用真实连接模式")
+        
+        use_splice = use_splice and hasattr(os, 'splice')
+        use_bridge = (use_selector or use_splice) and serial_ok and not use_mock and self._serial_fd is not None
+        if serial_ok and not use_bridge:
+            self._start_tx_flusher()
             
-        logger.info("=" * 50)
-        logger.info("NTRIP 测试开始")
-        logger.info(f"服务器: {host}:{port}")
-        logger.info(f"挂载点: {mountpoint}")
-        logger.info(f"用户: {username}")
-        logger.info(f"模式: {'模拟 (Mock)' if use_mock else '真实连接'}")
-        logger.info("=" * 50)
+        # 启动信息合并为一条日志输出
+        banner = [
+            "=" * 50,
+            "NTRIP 测试开始",
+            f"服务器: {host}:{port}",
+            f"挂载点: {mountpoint}",
+            f"用户: {username}",
+            f"模式: {'模拟 (Mock)' if use_mock else '真实连接'}",
+        ]
+        if use_bridge:
+            banner.append(f"转发: {'os.splice内核转发' if use_splice else 'selectors单线程桥接'}")
+        banner.append("=" * 50)
+        logger.info("\n".join(banner))
 
         if use_mock:
             self.client = MockNTRIPClient(host, port, mountpoint, username, password)
@@ -125,11 +380,14 @@ class NTRIPTester:
             self.client = NTRIPClient(host, port, mountpoint, username, password)
             
         # 注册回调
+        self._stop.clear()
         self.client.add_data_callback(self.on_data_received)
+        self.client.add_disconnect_callback(self._stop.set)
         
         # 连接
         logger.info("正在连接...")
-        if not self.client.connect():
+        connected = self.client.connect(start_receiver=False) if use_bridge else self.client.connect()
+        if not connected:
             logger.error("连接失败!")
             return
 
@@ -139,23 +397,21 @@ class NTRIPTester:
         if not use_mock:
             # 使用一个示例GGA (北京坐标)
             gga = "$GPGGA,065957.00,3013.3614985,N,12021.3076056,E,1,26,0.8,7.7131,M,7.953,M,,*67"
+            self._gga_bytes = (gga + "\r\n").encode("ascii")
             logger.info(f"发送GGA数据: {gga}")
-            self.client.send_gga(gga)
+            self.client.send_gga(self._gga_bytes)
             
         self.start_time = time.time()
         
         try:
-            # 运行指定时长
-            end_time = self.start_time + duration
-            while time.time() < end_time:
-                remaining = int(end_time - time.time())
-                # logger.info(f"测试进行中... 剩余 {remaining} 秒")
-                time.sleep(1)
-                
-                # 检查连接状态
-                if not self.client.is_connected:
-                    logger.error("连接意外断开!")
-                    break
+            # 运行指定时长，连接意外断开时提前结束
+            if use_bridge:
+                bridge = self._splice_loop if use_splice else self._bridge_loop
+                disconnected = bridge(duration)
+            else:
+                disconnected = self._stop.wait(timeout=duration) or not self.client.is_connected
+            if disconnected:
+                logger.error("连接意外断开!")
                     
         except KeyboardInterrupt:
             logger.info("\n测试被用户中断")
@@ -163,25 +419,32 @@ class NTRIPTester:
             print("") # 换行
             self.client.disconnect()
             if self.serial:
+                self._stop_tx_flusher()
                 self.serial.disconnect()
             self._print_stats()
 
     def _print_stats(self):
         """打印统计信息"""
         duration = time.time() - self.start_time
-        logger.info("-" * 50)
-        logger.info("测试结果统计:")
-        logger.info(f"持续时间: {duration:.2f} 秒")
-        logger.info(f"接收数据包: {self.received_packages}")
-        logger.info(f"接收总字节: {self.received_bytes}")
+        lines = [
+            "-" * 50,
+            "测试结果统计:",
+            f"持续时间: {duration:.2f} 秒",
+            f"接收数据包: {self.received_packages}",
+            f"接收总字节: {self.received_bytes}",
+        ]
         if duration > 0:
-            logger.info(f"平均速率: {self.received_bytes/duration:.2f} bytes/sec")
+            lines.append(f"平均速率: {self.received_bytes/duration:.2f} bytes/sec")
         
+        # 统计信息合并为一条日志输出，未收到数据时整体以WARNING级别输出
         if self.received_packages > 0:
-            logger.info("✅ NTRIP数据接收正常")
+            level = logging.INFO
+            lines.append("✅ NTRIP数据接收正常")
         else:
-            logger.warning("⚠️  未收到任何数据")
-        logger.info("-" * 50)
+            level = logging.WARNING
+            lines.append("⚠️  未收到任何数据")
+        lines.append("-" * 50)
+        logger.log(level, "\n".join(lines))
 
 if __name__ == "__main__":
     tester = NTRIPTester()
@@ -199,5 +462,8 @@ if __name__ == "__main__":
     if len(sys.argv) > 2:
         if sys.argv[2] == '--real':
             force_real = True
+    
+    use_selector = '--select' in sys.argv[1:]
+    use_splice = '--splice' in sys.argv[1:]
             
-    tester.run_test(duration, force_real)
+    tester.run_test(duration, force_real, use_selector, use_splice)
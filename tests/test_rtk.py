@@ -4,16 +4,17 @@
 RTK定位系统使用示例
 """
 
-import json
 import time
 import logging
 import sys
 import os
+from logging.handlers import MemoryHandler
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from src.rtk_positioning import RTKPositioningSystem, FixQuality
+from src.config import load_config_cached
 
 def load_config(config_file: str = 'config.json') -> dict:
     """加载配置文件"""
@@ -23,8 +24,7 @@ def load_config(config_file: str = 'config.json') -> dict:
         config_file = os.path.join(project_root, config_file)
     
     try:
-        with open(config_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return load_config_cached(config_file)
     except FileNotFoundError:
         print(f"配置文件 {config_file} 不存在，使用默认配置")
         return {
@@ -44,16 +44,22 @@ def setup_logging(config: dict):
     level = getattr(logging, log_config.get('level', 'INFO'))
     format_str = log_config.get('format', '%(asctime)s - %(levelname)s - %(message)s')
     
-    # 清除现有的处理器
+    # 清除现有的处理器 (关闭时写出缓冲中的日志)
     for handler in logging.root.handlers[:]:
         logging.root.removeHandler(handler)
+        handler.close()
+    
+    # 文件日志经MemoryHandler批量写入，WARNING及以上立即写出 (程序退出时由logging.shutdown写出剩余日志)
+    file_handler = logging.FileHandler(log_config.get('file', 'rtk_positioning.log'), encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(format_str))
+    memory_handler = MemoryHandler(capacity=1024, flushLevel=logging.WARNING, target=file_handler)
     
     logging.basicConfig(
         level=level,
         format=format_str,
         handlers=[
             logging.StreamHandler(),
-            logging.FileHandler(log_config.get('file', 'rtk_positioning.log'), encoding='utf-8')
+            memory_handler
         ],
         force=True
     )
@@ -166,7 +172,135 @@ def test_rtcm_parsing():
     except Exception as e:
         print(f"✗ _on_rtcm_1005 执行失败: {e}")
 
+def test_rtcm_framing():
+    """测试RTCM分帧 (分片、填充字节、超大数据块、伪帧头、缓冲区压缩)"""
+    from src import _rtk_fastpath as fastpath
+    from src.rtk_positioning import RTCMParser
+    import random
+
+    print("\n测试RTCM分帧")
+    print("-" * 30)
+
+    def make_frame(message_type: int, length: int) -> bytes:
+        """构造带正确CRC的RTCM帧，数据前12位为消息类型"""
+        payload = bytes([message_type >> 4, (message_type & 0x0F) << 4]) + bytes(i & 0xFF for i in range(length - 2))
+        frame = bytes([0xD3, length >> 8, length & 0xFF]) + payload
+        return frame + fastpath.crc24q(frame).to_bytes(3, 'big')
+
+    def parse_chunks(parser: RTCMParser, chunks) -> list:
+        types = []
+        for chunk in chunks:
+            types.extend(msg['type'] for msg in parser.parse_message(chunk))
+        return types
+
+    rng = random.Random(1)
+    types = [rng.choice([1005, 1077, 1087, 1127, 1230]) for _ in range(300)]
+    stream = b''.join(make_frame(t, rng.randint(2, 250)) for t in types)
+
+    # 1. 帧在随机位置被切分，足够的数据量使读指针越过一半容量并触发压缩
+    parser = RTCMParser()
+    compactions = []
+    compact = parser._compact
+    parser._compact = lambda: (compactions.append(1), compact())
+    chunks = []
+    pos = 0
+    while pos < len(stream):
+        n = rng.randint(1, 3000)
+        chunks.append(stream[pos:pos + n])
+        pos += n
+    assert parse_chunks(parser, chunks) == types
+    assert compactions, "未触发缓冲区压缩"
+    print(f"✓ 随机切分 ({len(chunks)}块, 压缩{len(compactions)}次)")
+
+    # 2. 帧之间夹杂填充字节 (不含0xD3)
+    filler = bytes(b for b in range(256) if b != 0xD3)
+    data = b''.join(make_frame(t, 20) + filler[:i % 40] for i, t in enumerate(types[:50]))
+    assert parse_chunks(RTCMParser(), [data]) == types[:50]
+    print("✓ 连续帧及填充字节")
+
+    # 3. 单个数据块超过缓冲区容量，处理完后缓冲区恢复为固定容量
+    parser = RTCMParser()
+    big_types = [1077] * 100
+    data = b''.join(make_frame(t, 1000) for t in big_types)
+    assert len(data) > RTCMParser.BUFFER_SIZE
+    assert parse_chunks(parser, [data]) == big_types
+    assert len(parser.buffer) == RTCMParser.BUFFER_SIZE
+    print("✓ 超大数据块")
+
+    # 4. CRC错误的伪帧头后紧跟有效帧
+    false_header = b'\xd3\x00\x01\x55\x00\x00\x00'
+    assert parse_chunks(RTCMParser(), [false_header + make_frame(1005, 19)]) == [1005]
+    print("✓ 伪帧头被跳过")
+
+def test_serial_nmea_dispatch():
+    """测试串口NMEA数据的分行、预过滤和校验"""
+    from src import _rtk_fastpath as fastpath
 
+    print("\n测试串口NMEA数据处理")
+    print("-" * 30)
+
+    def sentence(body: str) -> bytes:
+        return f"${body}*{fastpath.nmea_xor(body.encode()):02X}\r\n".encode()
+
+    rtk = RTKPositioningSystem(enabled_nmea_messages=['GGA'])
+    rtk.position_handler = None
+
+    # GGA跨两个数据块到达
+    gga = sentence("GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,")
+    rtk._on_serial_data(gga[:20])
+    assert rtk.current_position.latitude == 0
+    rtk._on_serial_data(gga[20:])
+    assert abs(rtk.current_position.latitude - 48.1173) < 1e-9
+    print("✓ 分块到达的GGA被解析")
+
+    # 未启用的RMC、未知talker、校验和错误的GGA均不更新位置
+    rtk._on_serial_data(
+        sentence("GPRMC,123520,A,3013.361,N,12021.307,E,0.0,0.0,010124,,,A")
+        + sentence("XXGGA,123520,3013.361,N,12021.307,E,1,08,0.9,7.7,M,7.9,M,,")
+        + b"$GPGGA,123520,3013.361,N,12021.307,E,1,08,0.9,7.7,M,7.9,M,,*00\r\n"
+    )
+    assert abs(rtk.current_position.latitude - 48.1173) < 1e-9
+    assert not rtk.nmea_buffer
+    print("✓ 未启用/未知/校验错误的语句被忽略")
+
+
+def test_fastpath_kernels():
+    """测试校验和/CRC加速内核"""
+    from src import _rtk_fastpath as fastpath
+    from src.rtk_positioning import MockNTRIPClient
+    
+    print("\n测试校验和/CRC加速内核")
+    print("-" * 30)
+    print(f"numba加速: {'启用' if fastpath.HAS_NUMBA else '未安装 (纯Python回退)'}")
+    print(f"crcmod CRC加速: {'启用' if fastpath.HAS_C_CRC else '未安装'}")
+    
+    # NMEA校验和
+    body = b"GPGGA,123519,4807.038,N,01131.000,E,1,08,0.9,545.4,M,46.9,M,,"
+    assert fastpath.nmea_xor(body) == 0x47
+    print("✓ NMEA异或校验正确")
+    
+    # CRC24Q 与逐位实现对比
+    client = MockNTRIPClient("localhost", 2101, "TEST")
+    data = bytes(range(256)) * 2
+    crc = 0
+    for byte in data:
+        crc ^= byte << 16
+        for _ in range(8):
+            crc = (crc << 1) ^ 0x1864CFB if crc & 0x800000 else crc << 1
+            crc &= 0xFFFFFF
+    assert fastpath.crc24q(data) == crc == client._calculate_crc24(data)
+    print("✓ CRC24Q计算正确")
+    
+    # 坐标解析
+    assert abs(fastpath.parse_coord(b"4807.038", False) - 48.1173) < 1e-9
+    assert abs(fastpath.parse_coord(b"01131.000", True) + 11.516666666) < 1e-6
+    for invalid in (b" 4807.038", b"48_07", b"-4807.0", b"48.07.1", b"."):
+        try:
+            fastpath.parse_coord(invalid, False)
+        except ValueError:
+            continue
+        raise AssertionError(f"非法坐标未被拒绝: {invalid!r}")
+    print("✓ DDMM.MMMM坐标解析正确")
 
 def test_nmea_message_filtering():
     """测试NMEA消息过滤功能"""
@@ -293,17 +427,29 @@ if __name__ == "__main__":
             test_nmea_message_filtering()
         elif sys.argv[1] == "test-rtcm":
             test_rtcm_parsing()
+        elif sys.argv[1] == "test-fastpath":
+            test_fastpath_kernels()
+        elif sys.argv[1] == "test-rtcm-framing":
+            test_rtcm_framing()
+        elif sys.argv[1] == "test-serial-nmea":
+            test_serial_nmea_dispatch()
         elif sys.argv[1] == "test-all":
             test_nmea_parsing()
             test_coordinate_conversion()
             test_nmea_message_filtering()
             test_rtcm_parsing()
+            test_fastpath_kernels()
+            test_rtcm_framing()
+            test_serial_nmea_dispatch()
         else:
             print("可用的测试选项:")
             print("  test-nmea   - 测试NMEA解析")
             print("  test-coord  - 测试坐标转换")
             print("  test-filter - 测试NMEA消息过滤")
             print("  test-rtcm   - 测试RTCM解析 (Mock)")
+            print("  test-fastpath - 测试校验和/CRC加速内核")
+            print("  test-rtcm-framing - 测试RTCM分帧")
+            print("  test-serial-nmea - 测试串口NMEA分行及消息预过滤")
             print("  test-all    - 运行所有测试")
     else:
         main()
\ No newline at end of file
@@ -7,32 +7,235 @@ RTK系统调试工具集
 
 import serial
 import time
-import json
 import sys
 import os
+import io
+import re
+import selectors
+import queue
+import threading
+from collections import Counter
 from datetime import datetime
 
 # 添加项目根目录到Python路径
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from src.rtk_positioning import RTKPositioningSystem, NMEAParser
+from src.rtk_positioning import RTKPositioningSystem
+from src import _rtk_fastpath as fastpath
+from src.config import load_config_cached
+
+# 标准NMEA语句标识: '$' + 2位talker ID + 3位语句类型
+_SID_RE = re.compile(rb'\$..([A-Z0-9]{3}),')
+
+# NMEA行分帧: 匹配缓冲区中 (去掉首尾空白后) 以'$'开头的每个完整行，
+# body为'$'与第一个'*'之间的语句体，cs为'*'之后的校验和 (缺少'*'时为None)
+_NMEA_RE = re.compile(
+    rb'^[ \t\r\x0b\x0c]*\$'
+    rb'(?P<body>[^*\n]*)'
+    rb'(?:\*(?P<cs>[^\n]*?))?'
+    rb'[ \t\r\x0b\x0c]*\n',
+    re.MULTILINE
+)
+
+# 十六进制字符 (字节值) 到半字节数值的查找表，非十六进制字符为-1
+_HEX = tuple(int(c, 16) if c in '0123456789abcdefABCDEF' else -1 for c in map(chr, range(256)))
+
+# 行缓冲区上限 (字节)，数据长时间无换行时丢弃最早的数据
+_LINE_BUFFER_LIMIT = 8192
+
+# 原始数据监控的控制台输出合并写出阈值: 累计字符数 / 时间间隔(秒)
+_OUTPUT_FLUSH_SIZE = 65536
+_OUTPUT_FLUSH_INTERVAL = 0.1
+_SEPARATOR_LINE = "-" * 80 + "\n"
+
+
+def _printable(i: int) -> str:
+    """单个字节的显示形式: 非ASCII字节同decode('ascii', 'replace')显示为替换字符，其余不可打印字符转义"""
+    if i >= 0x80:
+        return '\ufffd'
+    c = chr(i)
+    return c if c.isprintable() or c in '\r\n' else f'\\x{i:02x}'
+
+
+# 字节值到显示字符串的查找表
+_PRINT_TBL = tuple(_printable(i) for i in range(256))
+
+# 时间戳缓存: [整秒, "HH:MM:SS"]，同一秒内只调用一次strftime
+_ts_cache = [-1, ""]
+
+
+def _format_timestamp(ms: bool = True) -> str:
+    """当前时间的HH:MM:SS.mmm (ms=False时为HH:MM:SS) 字符串"""
+    t = time.time()
+    sec = int(t)
+    if sec != _ts_cache[0]:
+        _ts_cache[1] = time.strftime("%H:%M:%S", time.localtime(sec))
+        _ts_cache[0] = sec
+    if ms:
+        return f"{_ts_cache[1]}.{int(t * 1000) % 1000:03d}"
+    return _ts_cache[1]
+
+
+def _nmea_xor(buf, start: int, end: int) -> int:
+    """计算buf[start:end]的逐字节异或 (安装numba时使用JIT内核，切片不复制数据)"""
+    with memoryview(buf)[start:end] as body:
+        return fastpath.nmea_xor(body)
+
+
+def _sentence_checksum_ok(buf, m) -> bool:
+    """校验_NMEA_RE匹配出的语句的校验和，规则与NMEAParser.validate_checksum一致"""
+    cs = m.group('cs')
+    start, end = m.span('body')
+    # 去掉首尾空白后的整行 ('$' + 语句体 + '*' + 校验和) 至少8个字符
+    if len(cs) != 2 or end - start < 4:
+        return False
+    hi = _HEX[cs[0]]
+    lo = _HEX[cs[1]]
+    if hi < 0 or lo < 0:
+        return False
+    return _nmea_xor(buf, start, end) == (hi << 4) | lo
+
+
+def _message_type(buffer, m, _match_sid=_SID_RE.match) -> str:
+    """取出_NMEA_RE匹配出的语句的消息类型 (只需语句标识，无需切分全部字段)"""
+    sid_match = _match_sid(buffer, m.start('body') - 1)
+    if sid_match:
+        return sid_match.group(1).decode('ascii')
+    # 非标准语句 (如厂商私有语句) 沿用地址字段去掉前3个字符的规则
+    sid = m.group(0).strip().split(b',', 1)[0].decode('ascii', errors='replace')
+    return sid[3:] if len(sid) > 3 else sid
+
+
+def _process_lines_quiet(buffer, end: int, stats: dict):
+    """处理buffer[:end]中的完整行并更新stats，不输出任何内容"""
+    message_types = stats['message_types']
+    # 正则一次扫描所有完整行，直接取出以'$'开头的语句的语句体和校验和
+    for m in _NMEA_RE.finditer(buffer, 0, end):
+        stats['total_lines'] += 1
+        
+        # 检查完整性
+        if m.group('cs') is None:
+            stats['incomplete_lines'] += 1
+            continue
+        
+        # 检查校验和
+        if not _sentence_checksum_ok(buffer, m):
+            stats['checksum_errors'] += 1
+            continue
+        
+        message_types[_message_type(buffer, m)] += 1
+        stats['valid_nmea'] += 1
+
+
+def _process_lines_verbose(buffer, end: int, stats: dict):
+    """与_process_lines_quiet相同，并逐行输出语句及检查结果"""
+    message_types = stats['message_types']
+    for m in _NMEA_RE.finditer(buffer, 0, end):
+        stats['total_lines'] += 1
+        
+        # 显示NMEA消息 (仅在输出时解码)
+        timestamp = _format_timestamp(ms=False)
+        print(f"[{timestamp}] NMEA: {m.group(0).strip().decode('ascii', errors='replace')}")
+        
+        if m.group('cs') is None:
+            stats['incomplete_lines'] += 1
+            print(f"           ❌ 不完整消息 (缺少校验和)")
+            continue
+        
+        if not _sentence_checksum_ok(buffer, m):
+            stats['checksum_errors'] += 1
+            print(f"           ❌ 校验和错误")
+            continue
+        
+        message_type = _message_type(buffer, m)
+        message_types[message_type] += 1
+        print(f"           ✅ 有效的 {message_type} 消息")
+        stats['valid_nmea'] += 1
+        print()
+
+
+def _serial_reader(read, rx_queue, stop_event):
+    """串口读取线程: 只读取数据块放入队列，读取异常也放入队列交由解析线程处理"""
+    try:
+        while not stop_event.is_set():
+            data = read(4096)
+            if data:
+                rx_queue.put(data)
+    except Exception as e:
+        rx_queue.put(e)
+
+
+class _SelectorSerialReader:
+    """
+    POSIX串口读取: 用selectors等待串口fd可读，再一次读出已到达的数据
+
+    数据到达即返回，不必等待读满请求长度或读超时；空闲时阻塞在select中不占用CPU。
+    """
+
+    def __init__(self, ser, timeout: float = 0.1):
+        self._ser = ser
+        self._timeout = timeout
+        self._sel = selectors.DefaultSelector()
+        self._sel.register(ser.fileno(), selectors.EVENT_READ)
+        # 直接读取串口fd，readinto写入调用方的缓冲区而不分配新对象
+        self._raw = io.FileIO(ser.fileno(), 'rb', closefd=False)
+
+    def read(self, size: int = 4096) -> bytes:
+        """读取已到达的数据 (最多size字节)，超时返回空bytes"""
+        if not self._sel.select(self._timeout):
+            return b''
+        ser = self._ser
+        return ser.read(min(ser.in_waiting, size) or size)
+
+    def readinto(self, buf) -> int:
+        """将已到达的数据读入buf，返回读取的字节数，超时返回0"""
+        if not self._sel.select(self._timeout):
+            return 0
+        n = self._raw.readinto(buf)
+        if n == 0:
+            # 可读但读不到数据，与pyserial的处理一致
+            raise serial.SerialException('device reports readiness to read but returned no data '
+                                         '(device disconnected or multiple access on port?)')
+        return n or 0
+
+    def close(self):
+        """关闭selector (串口本身由调用方关闭)"""
+        self._sel.close()
+
 
 class RTKDebugTools:
     """RTK调试工具集"""
     
     def __init__(self):
         self.config = self._load_config()
-        self.parser = NMEAParser()
+        # 常用的串口参数只查找一次
+        serial_config = self.config.get('serial', {})
+        self._serial_port = serial_config.get('port')
+        self._serial_baud = serial_config.get('baudrate')
+        fastpath.warmup()
     
     def _load_config(self):
         """加载配置文件"""
         try:
-            with open('config.json', 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return load_config_cached('config.json')
         except Exception as e:
             print(f"❌ 配置文件加载失败: {e}")
             sys.exit(1)
     
+    def _open_reader(self, ser):
+        """
+        选择串口读取后端
+
+        POSIX平台用selectors等待串口fd可读；不可用时 (如Windows) 直接使用pyserial对象。
+        返回的对象提供read(size)、readinto(buf)和close()。
+        """
+        if os.name == 'posix':
+            try:
+                return _SelectorSerialReader(ser)
+            except (AttributeError, OSError, ValueError):
+                pass
+        return ser
+    
     def quick_test(self, duration: int = 15):
         """快速系统测试"""
         print("🚀 RTK系统快速测试")
@@ -43,12 +246,11 @@ class RTKDebugTools:
         
         try:
             # 配置系统
-            serial_config = self.config['serial']
             rtk_system.configure_serial(
-                port=serial_config['port'],
-                baudrate=serial_config['baudrate']
+                port=self._serial_port,
+                baudrate=self._serial_baud
             )
-            print(f"✅ 串口配置: {serial_config['port']} @ {serial_config['baudrate']}")
+            print(f"✅ 串口配置: {self._serial_port} @ {self._serial_baud}")
             
             # 启动系统
             if not rtk_system.start():
@@ -102,8 +304,7 @@ class RTKDebugTools:
         print("🔍 NMEA数据分析")
         print("=" * 50)
         
-        serial_config = self.config['serial']
-        print(f"连接串口: {serial_config['port']} @ {serial_config['baudrate']}")
+        print(f"连接串口: {self._serial_port} @ {self._serial_baud}")
         
         if show_raw:
             print("📡 原始数据输出模式已启用")
@@ -111,104 +312,97 @@ class RTKDebugTools:
         try:
             # 连接串口
             ser = serial.Serial(
-                port=serial_config['port'],
-                baudrate=serial_config['baudrate'],
-                timeout=1.0
+                port=self._serial_port,
+                baudrate=self._serial_baud,
+                timeout=0.05
             )
+            reader = self._open_reader(ser)
             
-            buffer = ""
+            buffer = bytearray()
+            buffer_trimmed = False
             stats = {
                 'total_bytes': 0,
                 'total_lines': 0,
                 'valid_nmea': 0,
                 'checksum_errors': 0,
                 'incomplete_lines': 0,
-                'message_types': {}
+                'message_types': Counter()
             }
             
             print(f"开始分析数据 ({duration}秒)...")
             if show_raw:
                 print("-" * 80)
             
-            start_time = time.time()
+            # 热循环中使用的函数和对象绑定为局部变量
+            _now = time.time
+            _timestamp = _format_timestamp
+            # 逐行处理函数按是否输出原始数据选定，热循环中不再判断show_raw
+            _process_lines = _process_lines_verbose if show_raw else _process_lines_quiet
             
-            while time.time() - start_time < duration:
-                if ser.in_waiting > 0:
-                    data = ser.read(ser.in_waiting)
+            # 读取线程只负责读取串口，解析和输出在当前线程进行
+            rx_queue = queue.SimpleQueue()
+            _get = rx_queue.get
+            stop_event = threading.Event()
+            reader_thread = threading.Thread(
+                target=_serial_reader, args=(reader.read, rx_queue, stop_event), daemon=True
+            )
+            reader_thread.start()
+            
+            start_time = _now()
+            
+            try:
+                while _now() - start_time < duration:
+                    # 等待读取线程的数据块，超时后重新检查测试时长
+                    try:
+                        data = _get(timeout=0.1)
+                    except queue.Empty:
+                        continue
+                    if isinstance(data, Exception):
+                        raise data
+                    
                     stats['total_bytes'] += len(data)
                     
                     # 显示原始字节数据
                     if show_raw and data:
-                        timestamp = time.strftime("%H:%M:%S") + f".{int(time.time() * 1000) % 1000:03d}"
-                        hex_data = ' '.join(f'{b:02X}' for b in data)
+                        timestamp = _timestamp()
+                        hex_data = data.hex(' ').upper()
                         print(f"[{timestamp}] RAW ({len(data)} bytes): {hex_data}")
                         
-                        # 尝试显示ASCII表示
-                        try:
-                            ascii_data = data.decode('ascii', errors='replace')
-                            ascii_repr = repr(ascii_data)
-                            print(f"[{timestamp}] ASCII: {ascii_repr}")
-                        except:
-                            pass
+                        # 显示ASCII表示 (不可解码字节显示为替换字符)
+                        print(f"[{timestamp}] ASCII: {data.decode('ascii', errors='replace')!r}")
                         print()
                     
                     try:
-                        text_data = data.decode('ascii', errors='ignore')
-                        buffer += text_data
+                        buffer += data
+                        
+                        # 只处理到最后一个换行为止的完整行，其后的不完整行保留到下次处理
+                        end = buffer.rfind(b'\n') + 1
                         
-                        # 处理完整的行
-                        while '\n' in buffer:
-                            line_end = buffer.find('\n')
-                            line = buffer[:line_end].strip()
-                            buffer = buffer[line_end + 1:]
-                            
-                            if not line or not line.startswith('$'):
-                                continue
-                                
-                            stats['total_lines'] += 1
-                            
-                            # 显示NMEA消息
-                            if show_raw:
-                                timestamp = time.strftime("%H:%M:%S")
-                                print(f"[{timestamp}] NMEA: {line}")
-                            
-                            # 检查完整性
-                            if '*' not in line:
-                                stats['incomplete_lines'] += 1
-                                if show_raw:
-                                    print(f"           ❌ 不完整消息 (缺少校验和)")
-                                continue
-                            
-                            # 检查校验和
-                            if not self.parser.validate_checksum(line):
-                                stats['checksum_errors'] += 1
-                                if show_raw:
-                                    print(f"           ❌ 校验和错误")
-                                continue
-                            
-                            # 统计消息类型
-                            fields = line.split(',')
-                            if len(fields) > 0:
-                                message_type = fields[0][3:] if len(fields[0]) > 3 else fields[0]
-                                stats['message_types'][message_type] = stats['message_types'].get(message_type, 0) + 1
-                                
-                                if show_raw:
-                                    print(f"           ✅ 有效的 {message_type} 消息")
-                            
-                            stats['valid_nmea'] += 1
-                            
-                            if show_raw:
-                                print()
+                        _process_lines(buffer, end, stats)
+                        
+                        del buffer[:end]
+                        if len(buffer) > _LINE_BUFFER_LIMIT:
+                            del buffer[:-_LINE_BUFFER_LIMIT]
+                            if not buffer_trimmed:
+                                buffer_trimmed = True
+                                print(f"⚠️  超过{_LINE_BUFFER_LIMIT}字节未收到换行，已丢弃较早的数据 (请检查串口配置)")
                     
                     except Exception as e:
                         print(f"⚠️  数据处理错误: {e}")
-                
-                time.sleep(0.01)
+            finally:
+                stop_event.set()
+                # 中断正在阻塞的pyserial读取 (其他读取后端会自行超时)
+                cancel_read = getattr(reader, 'cancel_read', None)
+                if cancel_read is not None:
+                    cancel_read()
+                reader_thread.join(timeout=1.0)
             
             # 打印统计结果
             if show_raw:
                 print("-" * 80)
             self._print_nmea_stats(stats)
+            if reader is not ser:
+                reader.close()
             ser.close()
             
         except Exception as e:
@@ -219,47 +413,76 @@ class RTKDebugTools:
         print("📡 原始数据监控")
         print("=" * 50)
         
-        serial_config = self.config['serial']
-        print(f"连接串口: {serial_config['port']} @ {serial_config['baudrate']}")
+        print(f"连接串口: {self._serial_port} @ {self._serial_baud}")
         print(f"监控时长: {duration}秒")
         print("=" * 80)
         
         try:
             # 连接串口
             ser = serial.Serial(
-                port=serial_config['port'],
-                baudrate=serial_config['baudrate'],
-                timeout=1.0
+                port=self._serial_port,
+                baudrate=self._serial_baud,
+                timeout=0.05
             )
+            reader = self._open_reader(ser)
             
-            start_time = time.time()
+            # 热循环中使用的函数绑定为局部变量
+            _now = time.time
+            _timestamp = _format_timestamp
+            _readinto = reader.readinto
+            _write = sys.stdout.write
+            _flush = sys.stdout.flush
+            
+            # 输出先累积在缓冲中，每100ms或累计64KB字符统一写出
+            out_buf = []
+            out_len = 0
+            
+            # 预分配的接收缓冲区，每次读取复用，不再为每个数据块分配bytes
+            rx_buf = bytearray(4096)
+            rx_view = memoryview(rx_buf)
+            
+            start_time = _now()
+            last_flush = start_time
             total_bytes = 0
             
-            while time.time() - start_time < duration:
-                if ser.in_waiting > 0:
-                    data = ser.read(ser.in_waiting)
-                    total_bytes += len(data)
-                    
-                    timestamp = time.strftime("%H:%M:%S") + f".{int(time.time() * 1000) % 1000:03d}"
-                    
-                    # 显示十六进制数据
-                    hex_data = ' '.join(f'{b:02X}' for b in data)
-                    print(f"[{timestamp}] HEX ({len(data):3d}): {hex_data}")
-                    
-                    # 显示ASCII数据
-                    try:
-                        ascii_data = data.decode('ascii', errors='replace')
-                        # 替换不可打印字符
-                        display_data = ''.join(c if c.isprintable() or c in '\r\n' else f'\\x{ord(c):02x}' for c in ascii_data)
-                        print(f"[{timestamp}] ASC ({len(data):3d}): {repr(display_data)}")
-                    except:
-                        print(f"[{timestamp}] ASC ({len(data):3d}): <decode error>")
+            try:
+                while _now() - start_time < duration:
+                    # 阻塞读取，超时返回已到达的数据，较大的读取量使突发数据一次取出
+                    n = _readinto(rx_view)
+                    if n:
+                        data = rx_view[:n]
+                        total_bytes += n
+                        
+                        timestamp = _timestamp()
+                        
+                        # 十六进制数据
+                        hex_data = data.hex(' ').upper()
+                        hex_line = f"[{timestamp}] HEX ({len(data):3d}): {hex_data}\n"
+                        
+                        # ASCII数据 (按字节查表替换不可打印字符)
+                        display_data = ''.join(map(_PRINT_TBL.__getitem__, data))
+                        asc_line = f"[{timestamp}] ASC ({len(data):3d}): {repr(display_data)}\n"
+                        
+                        out_buf.append(hex_line)
+                        out_buf.append(asc_line)
+                        out_buf.append(_SEPARATOR_LINE)
+                        out_len += len(hex_line) + len(asc_line) + len(_SEPARATOR_LINE)
                     
-                    print("-" * 80)
-                
-                time.sleep(0.01)
+                    now = _now()
+                    if out_buf and (out_len >= _OUTPUT_FLUSH_SIZE or now - last_flush >= _OUTPUT_FLUSH_INTERVAL):
+                        _write(''.join(out_buf))
+                        _flush()
+                        out_buf.clear()
+                        out_len = 0
+                        last_flush = now
+            finally:
+                if out_buf:
+                    _write(''.join(out_buf))
+                    _flush()
             
             print(f"\n📊 监控完成，总接收字节数: {total_bytes:,}")
+            if reader is not ser:
+                reader.close()
             ser.close()
             
         except Exception as e:
@@ -275,22 +498,24 @@ class RTKDebugTools:
         print(f"   校验和错误: {stats['checksum_errors']:,}")
         print(f"   不完整消息: {stats['incomplete_lines']:,}")
         
-        if stats['message_types']:
-            print("\n📡 消息类型分布:")
-            for msg_type, count in sorted(stats['message_types'].items()):
+        message_types = stats['message_types']
+        if message_types:
+            print("\n📡 消息类型分布 (按数量排序):")
+            for msg_type, count in message_types.most_common():
                 print(f"   {msg_type}: {count:,}")
         
         # 计算成功率
-        total_attempts = stats['valid_nmea'] + stats['checksum_errors'] + stats['incomplete_lines']
+        valid = stats['valid_nmea']
+        total_attempts = valid + stats['checksum_errors'] + stats['incomplete_lines']
         if total_attempts > 0:
-            success_rate = (stats['valid_nmea'] / total_attempts) * 100
+            success_rate = (valid / total_attempts) * 100
             print(f"\n✅ 解析成功率: {success_rate:.1f}%")
     
     def system_info(self):
         """显示系统信息"""
         print("ℹ️  RTK系统信息")
         print("=" * 50)
-        print(f"串口: {self.config['serial']['port']} @ {self.config['serial']['baudrate']}")
+        print(f"串口: {self._serial_port} @ {self._serial_baud}")
         
         ntrip_config = self.config.get('ntrip', {})
         if ntrip_config.get('enabled', False):